@@ -8,28 +8,59 @@ sensible defaults for development. Key settings include:
 - ANTHROPIC_API_KEY: Required API key for Claude
 - MEMORY_DIR: Directory for storing todo data (default: ./memories)
 - LOG_LEVEL: Logging verbosity (default: DEBUG)
+- LOG_FILE: Optional file that also receives log output
+- BATCH_MODE: Answer piped input through the Message Batches API (default: off)
 - MODEL: Claude model to use (default: claude-sonnet-4-20250514)
 
 The system prompt is intentionally capability-focused rather than prescriptive,
 allowing Claude to autonomously decide how to organize todo data in memory.
 """
 
+import atexit
 import os
 import logging
+import logging.handlers
+import queue
+from datetime import date
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
 from dotenv import load_dotenv
 
+
+@lru_cache(maxsize=1)
+def _load_env() -> bool:
+    """Load environment variables from the .env file.
+
+    Cached so the file is parsed at most once per process, no matter how many
+    entry points (app, eval harness) trigger configuration loading.
+
+    Returns:
+        True if a .env file was found and loaded
+    """
+    return load_dotenv()
+
+
 # Load environment variables from .env file
-load_dotenv()
+_load_env()
+
+# Read-only snapshot of the environment, taken once after .env is loaded.
+# Read settings from here rather than os.environ so every module sees the
+# same startup values.
+ENV = MappingProxyType(dict(os.environ))
 
 # Memory storage directory
-MEMORY_DIR = os.getenv("MEMORY_DIR", "./memories")
+MEMORY_DIR = ENV.get("MEMORY_DIR", "./memories")
 
 # Logging configuration
-LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+LOG_LEVEL = ENV.get("LOG_LEVEL", "DEBUG")
+
+# Optional log file, written alongside stderr
+LOG_FILE = ENV.get("LOG_FILE")
 
 # Anthropic API configuration
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+ANTHROPIC_API_KEY = ENV.get("ANTHROPIC_API_KEY")
 
 # Model to use
 MODEL = "claude-sonnet-4-20250514"
@@ -37,6 +68,13 @@ MODEL = "claude-sonnet-4-20250514"
 # Beta header for memory tool
 BETA_HEADER = "context-management-2025-06-27"
 
+# HTTP connection pool for the Anthropic client
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_MAX_CONNECTIONS = 100
+HTTP_KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept open
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_TIMEOUT = 600.0  # read timeout; long generations can take minutes
+
 # System prompt template - focused on capabilities, not implementation
 SYSTEM_PROMPT_TEMPLATE = """You are a helpful assistant helping the user to store and recall the tasks they need to accomplish.
 
@@ -47,15 +85,55 @@ When the user mentions tasks they need to do, USE THE MEMORY TOOL to store them
 It's important you remember any tasks the user needs to remember. Ensure you can update the progress on tasks. Ensure you can report the state of a task to the user."""
 
 
+# Template text around the date placeholder, split once at import so the
+# prompt is built by concatenation instead of str.format
+_PROMPT_PREFIX, _PROMPT_SUFFIX = SYSTEM_PROMPT_TEMPLATE.split("{current_date}")
+
+# Cached system prompt for the current day: [date ordinal, prompt string]
+_PROMPT_CACHE = [None, None]
+
+
 def get_system_prompt() -> str:
     """Get the system prompt with current date injected.
 
+    The formatted prompt is cached per calendar day; on the steady-state
+    path this is a single ordinal comparison.
+
     Returns:
         System prompt string with today's date
     """
-    from datetime import datetime
-    current_date = datetime.now().strftime("%A, %B %d, %Y")
-    return SYSTEM_PROMPT_TEMPLATE.format(current_date=current_date)
+    today = date.today()
+    ordinal = today.toordinal()
+    if _PROMPT_CACHE[0] != ordinal:
+        current_date = today.strftime("%A, %B %d, %Y")
+        _PROMPT_CACHE[1] = _PROMPT_PREFIX + current_date + _PROMPT_SUFFIX
+        _PROMPT_CACHE[0] = ordinal
+    return _PROMPT_CACHE[1]
+
+# Prompt caching: breakpoint type, and how many of the latest user turns
+# carry a breakpoint (the system prompt always has one)
+CACHE_CONTROL = {"type": "ephemeral"}
+CACHE_BREAKPOINT_TURNS = 2
+
+# Client-side history window: once history exceeds HISTORY_MAX_MESSAGES,
+# everything but the last HISTORY_KEEP_MESSAGES is replaced by a summary
+HISTORY_MAX_MESSAGES = 40
+HISTORY_KEEP_MESSAGES = 20
+HISTORY_SUMMARY_MAX_TOKENS = 256
+
+# Response cache: queries with fewer words than this (after normalization)
+# are treated as context-dependent replies and never cached
+RESPONSE_CACHE_MIN_WORDS = 3
+
+# Opt-in batch mode: when set and stdin is not a terminal, each input line
+# is answered as an independent query through the Message Batches API
+BATCH_MODE = ENV.get("BATCH_MODE", "").lower() in ("1", "true", "yes")
+
+# Batch mode limits: queries per Message Batch, seconds between status
+# polls, and the cap on tool-use rounds per query
+BATCH_MAX_REQUESTS = 64
+BATCH_POLL_INTERVAL = 5.0
+BATCH_MAX_TOOL_ROUNDS = 10
 
 # Context management configuration (from SDK example)
 CONTEXT_MANAGEMENT = {
@@ -67,13 +145,44 @@ CONTEXT_MANAGEMENT = {
 }
 
 
+# Formatter shared by every log handler
+LOG_FORMATTER = logging.Formatter(
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Background listener that owns the real log handlers (see setup_logging)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
 def setup_logging():
-    """Configure logging for the application."""
-    logging.basicConfig(
-        level=getattr(logging, LOG_LEVEL.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    """Configure logging for the application.
+
+    Log records are put on a queue and written to stderr (and LOG_FILE,
+    if set) by a background listener thread, so logging calls never block
+    on stream or disk I/O. Safe to call more than once; only the first
+    call installs handlers.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    handlers = [logging.StreamHandler()]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(LOG_FORMATTER)
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, LOG_LEVEL.upper()))
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _log_listener.start()
+
+    # Drain queued records before the interpreter exits
+    atexit.register(_log_listener.stop)
 
 
 def validate_config():
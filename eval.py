@@ -32,63 +32,119 @@ Usage:
     python eval.py
 
     The suite will:
-    - Run all test cases sequentially
+    - Run the session tests in order, concurrently with the persistence test
     - Display pass/fail for each test
     - Analyze memory structure
     - Report observations and statistics
     - Exit with code 0 if all tests pass, 1 otherwise
 
 Environment:
-- Uses a separate ./memories_test directory (cleaned before each run)
+- Uses separate ./memories_test and ./memories_test_persistence directories
+  (cleaned before each run)
 - Requires ANTHROPIC_API_KEY in environment or .env file
 - Can set EVAL_DEBUG=1 for verbose logging during tests
+- Can set EVAL_JSON=<path> to also write results and analysis as JSON
+- Caches LLM validation verdicts in .eval_validation_cache (delete to reset)
 """
 
-import json
+import asyncio
+import hashlib
+import inspect
 import logging
 import os
-import shutil
+import shelve
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 import config
-from memory_tool import LocalFilesystemMemoryTool
+from memory_tool import AsyncLocalFilesystemMemoryTool
+
+# Prefer orjson for JSON output when installed; fall back to the stdlib
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+except ImportError:
+    import json
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
 
 # Disable verbose logging during eval unless DEBUG is set
-if os.getenv("EVAL_DEBUG"):
+if config.ENV.get("EVAL_DEBUG"):
     config.setup_logging()
 else:
     logging.basicConfig(level=logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+# Number of characters shown in memory file previews
+PREVIEW_CHARS = 200
 
-class EvalTestCase:
-    """Represents a single evaluation test case."""
+# Only files up to this size get a preview, and at most this many files
+PREVIEW_MAX_BYTES = 4096
+PREVIEW_MAX_FILES = 20
 
-    def __init__(
-        self,
-        name: str,
-        prompt: str,
-        expected_behavior: str,
-        validation_fn=None
-    ):
-        """Initialize a test case.
+# Worker threads used to clear test memory directories
+RMTREE_WORKERS = 8
+
+# Model used for LLM-based validation
+VALIDATION_MODEL = "claude-3-5-sonnet-20241022"
+
+# On-disk cache of validation verdicts (delete to force re-validation)
+VALIDATION_CACHE_PATH = ".eval_validation_cache"
+
+# Separate memory directory for the persistence test (cleaned before each run)
+PERSISTENCE_MEMORY_DIR = "./memories_test_persistence"
+
+
+def _fast_rmtree(root: Path):
+    """Remove a directory tree, unlinking files in parallel.
+
+    os.unlink releases the GIL, so a thread pool overlaps the per-file
+    syscalls; directories are then removed bottom-up.
+
+    Args:
+        root: Directory to remove
+    """
+    files = []
+    dirs = []
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        files.extend(os.path.join(dirpath, name) for name in filenames)
+        # Symlinks to directories are listed as dirs but must be unlinked
+        files.extend(
+            path for path in (os.path.join(dirpath, name) for name in dirnames)
+            if os.path.islink(path)
+        )
+        dirs.append(dirpath)
+
+    with ThreadPoolExecutor(max_workers=RMTREE_WORKERS) as executor:
+        list(executor.map(os.unlink, files))
+
+    for directory in dirs:
+        os.rmdir(directory)
 
-        Args:
-            name: Test case name
-            prompt: User prompt to send to the agent
-            expected_behavior: Description of expected behavior
-            validation_fn: Optional function to validate the response
-        """
-        self.name = name
-        self.prompt = prompt
-        self.expected_behavior = expected_behavior
-        self.validation_fn = validation_fn
+
+class EvalTestCase(NamedTuple):
+    """Represents a single evaluation test case.
+
+    Attributes:
+        name: Test case name
+        prompt: User prompt to send to the agent
+        expected_behavior: Description of expected behavior
+        validation_fn: Optional function to validate the response
+    """
+
+    name: str
+    prompt: str
+    expected_behavior: str
+    validation_fn: Optional[Callable] = None
 
 
 class TodoEvaluator:
@@ -101,21 +157,27 @@ class TodoEvaluator:
             test_memory_dir: Directory for test memory (will be cleaned)
         """
         self.test_memory_dir = Path(test_memory_dir)
-        self.client = Anthropic(api_key=config.ANTHROPIC_API_KEY)
-        self.memory_tool = None
+        self.client = AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY)
         self.messages = []
 
+        # Serializes conversation turns so tests sharing this session send
+        # their prompts in order while validations run concurrently
+        self._turn_lock = asyncio.Lock()
+
         # Clean test directory
         if self.test_memory_dir.exists():
-            shutil.rmtree(self.test_memory_dir)
+            _fast_rmtree(self.test_memory_dir)
         self.test_memory_dir.mkdir(parents=True, exist_ok=True)
 
+        # The memory tool holds no per-session state, so one instance serves
+        # every session against this directory
+        self.memory_tool = AsyncLocalFilesystemMemoryTool(self.test_memory_dir)
+
     def reset_session(self):
         """Reset the agent session (new conversation)."""
         self.messages = []
-        self.memory_tool = LocalFilesystemMemoryTool(self.test_memory_dir)
 
-    def send_message(self, prompt: str) -> str:
+    async def send_message(self, prompt: str) -> str:
         """Send a message to the agent and get response.
 
         Args:
@@ -138,7 +200,7 @@ class TodoEvaluator:
 
         # Iterate through messages to get final response
         final_message = None
-        for message in runner:
+        async for message in runner:
             final_message = message
 
         # Extract text
@@ -152,9 +214,12 @@ class TodoEvaluator:
 
         return "\n".join(response_parts)
 
-    def validate_with_llm(self, response: str, expected: str) -> bool:
+    async def validate_with_llm(self, response: str, expected: str) -> bool:
         """Use an LLM to validate if response meets expectations.
 
+        Verdicts are cached on disk keyed by a hash of the validation model,
+        expected behavior and response, so repeated runs skip the API call.
+
         Args:
             response: Agent's response
             expected: Expected behavior description
@@ -171,36 +236,61 @@ Agent's response: {response}
 Does the response demonstrate the expected behavior? Consider the intent and meaning, not exact wording.
 Answer with just "YES" or "NO"."""
 
-        result = self.client.messages.create(
-            model="claude-3-5-sonnet-20241022",
+        # Reuse verdicts from previous runs for identical inputs
+        cache_key = hashlib.sha256(
+            f"{VALIDATION_MODEL}\x00{expected}\x00{response}".encode("utf-8")
+        ).hexdigest()
+        with shelve.open(VALIDATION_CACHE_PATH) as cache:
+            if cache_key in cache:
+                logger.debug("Validation cache hit")
+                return cache[cache_key]
+
+        result = await self.client.messages.create(
+            model=VALIDATION_MODEL,
             max_tokens=10,
             messages=[{"role": "user", "content": validation_prompt}]
         )
 
         answer = result.content[0].text.strip().upper()
-        return answer == "YES"
+        passed = answer == "YES"
+
+        with shelve.open(VALIDATION_CACHE_PATH) as cache:
+            cache[cache_key] = passed
 
-    def run_test(self, test: EvalTestCase) -> Dict[str, Any]:
+        return passed
+
+    async def run_test(self, test: EvalTestCase) -> Dict[str, Any]:
         """Run a single test case.
 
+        Only the conversation turn holds the session lock; validation runs
+        after it is released, so it overlaps with the next test's turn when
+        tests are scheduled concurrently on the same session.
+
         Args:
             test: Test case to run
 
         Returns:
             Test result dictionary
         """
+        # Wait for this test's turn before starting the clock
+        await self._turn_lock.acquire()
         start_time = time.time()
 
         try:
             # Send prompt
-            response = self.send_message(test.prompt)
+            try:
+                response = await self.send_message(test.prompt)
+            finally:
+                self._turn_lock.release()
 
             # Validate
             if test.validation_fn:
                 passed = test.validation_fn(self, response)
+                if inspect.isawaitable(passed):
+                    passed = await passed
             else:
                 # Use LLM validation
-                passed = self.validate_with_llm(response, test.expected_behavior)
+                passed = await self.validate_with_llm(response, test.expected_behavior)
 
             duration = time.time() - start_time
 
@@ -214,7 +304,7 @@ Answer with just "YES" or "NO"."""
 
         except Exception as e:
             duration = time.time() - start_time
-            logger.error(f"Test failed with exception: {e}", exc_info=True)
+            logger.error("Test failed with exception: %s", e, exc_info=True)
             return {
                 "name": test.name,
                 "passed": False,
@@ -224,13 +314,13 @@ Answer with just "YES" or "NO"."""
             }
 
 
-def create_test_suite() -> List[EvalTestCase]:
+def create_test_suite() -> Tuple[EvalTestCase, ...]:
     """Create the evaluation test suite.
 
     Returns:
-        List of test cases
+        Tuple of test cases
     """
-    return [
+    return (
         EvalTestCase(
             name="Add Todo",
             prompt="Add a task to buy milk",
@@ -261,10 +351,10 @@ def create_test_suite() -> List[EvalTestCase]:
             prompt="Add tasks: walk the dog, call dentist, finish report",
             expected_behavior="Agent adds three separate tasks"
         ),
-    ]
+    )
 
 
-def run_persistence_test(evaluator: TodoEvaluator) -> Dict[str, Any]:
+async def run_persistence_test(evaluator: TodoEvaluator) -> Dict[str, Any]:
     """Test persistence across sessions.
 
     Args:
@@ -278,14 +368,14 @@ def run_persistence_test(evaluator: TodoEvaluator) -> Dict[str, Any]:
     try:
         # First session: add a task
         evaluator.reset_session()
-        evaluator.send_message("Add a task to review code")
+        await evaluator.send_message("Add a task to review code")
 
         # Second session: check if it persists
         evaluator.reset_session()
-        response = evaluator.send_message("What tasks do I have?")
+        response = await evaluator.send_message("What tasks do I have?")
 
         # Validate that the task persists
-        passed = evaluator.validate_with_llm(
+        passed = await evaluator.validate_with_llm(
             response,
             "Agent shows the 'review code' task that was added in a previous session"
         )
@@ -302,7 +392,7 @@ def run_persistence_test(evaluator: TodoEvaluator) -> Dict[str, Any]:
 
     except Exception as e:
         duration = time.time() - start_time
-        logger.error(f"Persistence test failed: {e}", exc_info=True)
+        logger.error("Persistence test failed: %s", e, exc_info=True)
         return {
             "name": "Persistence Check",
             "passed": False,
@@ -312,6 +402,25 @@ def run_persistence_test(evaluator: TodoEvaluator) -> Dict[str, Any]:
         }
 
 
+def _walk_memory_dir(directory: Path) -> Iterator[os.DirEntry]:
+    """Recursively yield every entry under a directory.
+
+    Uses os.scandir so file type checks come from the directory read
+    instead of an extra stat per entry.
+
+    Args:
+        directory: Directory to walk
+
+    Yields:
+        Directory entries (files and subdirectories)
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            yield entry
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_memory_dir(entry.path)
+
+
 def analyze_memory_structure(test_memory_dir: Path) -> Dict[str, Any]:
     """Analyze the memory structure created by Claude.
 
@@ -325,41 +434,71 @@ def analyze_memory_structure(test_memory_dir: Path) -> Dict[str, Any]:
         "files": [],
         "total_files": 0,
         "total_dirs": 0,
-        "file_formats": set(),
+        "file_formats": [],
         "observations": []
     }
 
-    for item in test_memory_dir.rglob("*"):
-        rel_path = item.relative_to(test_memory_dir)
+    root = str(test_memory_dir) + os.sep
+    file_formats = set()
+
+    # First pass: collect metadata only, without reading any file
+    metadata = []
+    for entry in _walk_memory_dir(test_memory_dir):
+        rel_path = entry.path[len(root):]
 
-        if item.is_file():
+        if entry.is_file(follow_symlinks=False):
             analysis["total_files"] += 1
 
             # Detect format
-            suffix = item.suffix.lower()
+            suffix = os.path.splitext(entry.name)[1].lower()
             if suffix:
-                analysis["file_formats"].add(suffix)
+                file_formats.add(suffix)
 
-            # Read preview
             try:
-                content = item.read_text(encoding="utf-8")
-                preview = content[:200] + "..." if len(content) > 200 else content
-
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError as e:
                 analysis["files"].append({
-                    "path": str(rel_path),
-                    "size": len(content),
-                    "format": suffix or "no extension",
-                    "preview": preview
-                })
-            except Exception as e:
-                analysis["files"].append({
-                    "path": str(rel_path),
+                    "path": rel_path,
                     "error": str(e)
                 })
+                continue
+
+            metadata.append((entry.path, rel_path, size, suffix))
 
-        elif item.is_dir():
+        elif entry.is_dir(follow_symlinks=False):
             analysis["total_dirs"] += 1
 
+    # Second pass: read previews for a bounded number of small files
+    previews_left = PREVIEW_MAX_FILES
+    for path, rel_path, size, suffix in metadata:
+        file_info = {
+            "path": rel_path,
+            "size": size,
+            "format": suffix or "no extension",
+            "preview": None
+        }
+
+        if size <= PREVIEW_MAX_BYTES and previews_left > 0:
+            previews_left -= 1
+
+            # Bounded read, one char past the cutoff to detect truncation
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read(PREVIEW_CHARS + 1)
+                if len(content) > PREVIEW_CHARS:
+                    file_info["preview"] = content[:PREVIEW_CHARS] + "..."
+                else:
+                    file_info["preview"] = content
+            except Exception as e:
+                file_info = {
+                    "path": rel_path,
+                    "error": str(e)
+                }
+
+        analysis["files"].append(file_info)
+
+    analysis["file_formats"] = sorted(file_formats)
+
     # Generate observations
     if ".json" in analysis["file_formats"]:
         analysis["observations"].append("Uses JSON format")
@@ -373,7 +512,67 @@ def analyze_memory_structure(test_memory_dir: Path) -> Dict[str, Any]:
     return analysis
 
 
-def main():
+def _print_result(label: str, result: Dict[str, Any]):
+    """Print a single pass/fail line for a test result.
+
+    Args:
+        label: Progress label shown before the outcome
+        result: Test result dictionary
+    """
+    if result["passed"]:
+        print(f"{label} ✓ PASS ({result['duration']:.1f}s)", flush=True)
+    else:
+        print(f"{label} ✗ FAIL ({result['duration']:.1f}s)", flush=True)
+        if result["error"]:
+            print(f"      Error: {result['error']}", flush=True)
+
+
+async def run_sequential_tests(
+    evaluator: TodoEvaluator,
+    test_suite: Tuple[EvalTestCase, ...]
+) -> List[Dict[str, Any]]:
+    """Run tests that build on each other within a single session.
+
+    Prompts are sent strictly in order, but each test's LLM validation
+    overlaps with the next test's conversation turn.
+
+    Args:
+        evaluator: Evaluator holding the shared session
+        test_suite: Tests to run in order
+
+    Returns:
+        List of test result dictionaries, in suite order
+    """
+    evaluator.reset_session()
+
+    # Tasks start in creation order and the session lock is FIFO, so turns
+    # are sent in suite order
+    tasks = [asyncio.create_task(evaluator.run_test(test)) for test in test_suite]
+
+    results = []
+    for i, (test, task) in enumerate(zip(test_suite, tasks), 1):
+        result = await task
+        _print_result(f"  [{i}/{len(test_suite)}] {test.name}...", result)
+        results.append(result)
+
+    return results
+
+
+async def run_persistence_check(evaluator: TodoEvaluator) -> Dict[str, Any]:
+    """Run the persistence test and report its outcome.
+
+    Args:
+        evaluator: Evaluator with its own memory directory
+
+    Returns:
+        Test result dictionary
+    """
+    result = await run_persistence_test(evaluator)
+    _print_result("  [*] Persistence Check...", result)
+    return result
+
+
+async def main():
     """Run the evaluation suite."""
     print("=" * 60)
     print("Agent Memory Todo - Evaluation Suite")
@@ -383,41 +582,23 @@ def main():
     # Check API key
     if not config.ANTHROPIC_API_KEY:
         print("ERROR: ANTHROPIC_API_KEY not set")
-        sys.exit(1)
+        return 1
 
     evaluator = TodoEvaluator()
+    # The persistence test gets its own memory directory so it can run
+    # concurrently with the sequential tests without sharing files
+    persistence_evaluator = TodoEvaluator(PERSISTENCE_MEMORY_DIR)
     test_suite = create_test_suite()
 
-    results = []
-
-    # Run sequential tests (build on each other)
-    print("Running sequential tests...")
-    evaluator.reset_session()
-
-    for i, test in enumerate(test_suite, 1):
-        print(f"  [{i}/{len(test_suite)}] {test.name}...", end=" ", flush=True)
-        result = evaluator.run_test(test)
-        results.append(result)
+    # Run sequential tests (build on each other) alongside the persistence test
+    print("Running sequential and persistence tests...")
+    sequential_results, persist_result = await asyncio.gather(
+        run_sequential_tests(evaluator, test_suite),
+        run_persistence_check(persistence_evaluator),
+    )
+    results = sequential_results + [persist_result]
 
-        if result["passed"]:
-            print(f"✓ PASS ({result['duration']:.1f}s)")
-        else:
-            print(f"✗ FAIL ({result['duration']:.1f}s)")
-            if result["error"]:
-                print(f"      Error: {result['error']}")
-
-    # Run persistence test
-    print("\nRunning persistence test...")
-    print(f"  [*] Persistence Check...", end=" ", flush=True)
-    persist_result = run_persistence_test(evaluator)
-    results.append(persist_result)
-
-    if persist_result["passed"]:
-        print(f"✓ PASS ({persist_result['duration']:.1f}s)")
-    else:
-        print(f"✗ FAIL ({persist_result['duration']:.1f}s)")
-        if persist_result["error"]:
-            print(f"      Error: {persist_result['error']}")
+    await asyncio.gather(evaluator.client.close(), persistence_evaluator.client.close())
 
     # Analyze memory structure
     print("\n" + "=" * 60)
@@ -437,7 +618,8 @@ def main():
                 print(f"  - {file_info['path']}: ERROR - {file_info['error']}")
             else:
                 print(f"  - {file_info['path']} ({file_info['size']} bytes, {file_info['format']})")
-                print(f"    Preview: {file_info['preview'][:100]}...")
+                if file_info["preview"] is not None:
+                    print(f"    Preview: {file_info['preview'][:100]}...")
 
     if analysis["observations"]:
         print("\nObservations:")
@@ -455,6 +637,15 @@ def main():
 
     print(f"\n{passed}/{total} tests passed ({pass_rate:.0f}%)")
 
+    # Machine-readable output
+    json_path = config.ENV.get("EVAL_JSON")
+    if json_path:
+        Path(json_path).write_text(
+            _dumps({"results": results, "analysis": analysis}),
+            encoding="utf-8"
+        )
+        print(f"Results written to {json_path}")
+
     if passed == total:
         print("\n✓ All tests passed!")
         return 0
@@ -470,4 +661,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))
@@ -14,22 +14,212 @@ The implementation supports all standard memory operations:
 
 Security Features:
 - All operations are restricted to a configured memory directory
-- Path traversal attacks are prevented through validation
+- Path traversal attacks are prevented through validation: paths are first
+  checked logically, then the real (symlink-resolved) location of each
+  path's parent directory must lie inside the memory directory, so
+  symlinked directories cannot be used to reach outside it
+- Files are opened with O_NOFOLLOW, so a symlink at the final path
+  component is never followed on read or write
 - Comprehensive error handling and logging at DEBUG level
 
 The key insight of this implementation is that it receives command objects
 from the SDK with attributes like `path` and `file_text`, which are then
 executed as filesystem operations. This allows Claude to autonomously decide
 how to organize and structure todo data without prescriptive schemas.
+
+AsyncLocalFilesystemMemoryTool exposes the same backend through the
+BetaAsyncAbstractMemoryTool interface for use with AsyncAnthropic.
 """
 
+import asyncio
+import io
 import logging
+import mmap
+import os
+import re
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, Tuple, Union
 
-from anthropic.lib.tools import BetaAbstractMemoryTool
+from anthropic.lib.tools import BetaAbstractMemoryTool, BetaAsyncAbstractMemoryTool
 
 logger = logging.getLogger(__name__)
 
+# Matches the virtual /memories prefix Claude uses for memory paths
+_MEMORIES_PREFIX_RE = re.compile(r"^/?memories(?:/|$)")
+
+
+# Flags for opening memory files: never leak descriptors into child
+# processes and refuse to follow a symlink planted at the final component
+_READ_FLAGS = os.O_RDONLY | os.O_CLOEXEC | os.O_NOFOLLOW
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC | os.O_NOFOLLOW
+_APPEND_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CLOEXEC | os.O_NOFOLLOW
+
+# Mode for newly created memory files (owner read/write only)
+_FILE_MODE = 0o600
+
+# insert_line value meaning "append after the last line"
+APPEND_LINE = -1
+
+
+def _read_file(path: Path) -> bytes:
+    """Read a whole file with a single unbuffered descriptor.
+
+    Args:
+        path: File to read
+
+    Returns:
+        Raw file contents
+    """
+    fd = os.open(path, _READ_FLAGS)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while chunk := os.read(fd, max(size, 1)):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _write_file(path: Path, data: bytes, flags: int = _WRITE_FLAGS) -> None:
+    """Write data to a file with a single descriptor.
+
+    Args:
+        path: File to write
+        data: Raw contents to write
+        flags: os.open flags (default: create or truncate)
+    """
+    fd = os.open(path, flags, _FILE_MODE)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _map_file(path: Path) -> Iterator[Tuple[Union[mmap.mmap, bytes], os.stat_result]]:
+    """Memory-map a file for reading.
+
+    Empty files cannot be mapped, so they are exposed as empty bytes.
+
+    Args:
+        path: File to map
+
+    Yields:
+        Tuple of read-only mmap (or b"" for an empty file) and file status
+    """
+    fd = os.open(path, _READ_FLAGS)
+    try:
+        st = os.fstat(fd)
+        if st.st_size == 0:
+            yield b"", st
+            return
+
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            yield mm, st
+    finally:
+        os.close(fd)
+
+
+def _count_lines(data: Union[mmap.mmap, bytes]) -> int:
+    """Count lines without splitting the contents.
+
+    Args:
+        data: File contents
+
+    Returns:
+        Number of lines, counting a trailing line without a newline
+    """
+    count = 0
+    offset = 0
+    while (newline := data.find(b"\n", offset)) != -1:
+        count += 1
+        offset = newline + 1
+    if offset < len(data):
+        count += 1
+    return count
+
+
+def _line_offset(data: Union[mmap.mmap, bytes], line: int) -> int:
+    """Find the byte offset where a given line starts.
+
+    Args:
+        data: File contents
+        line: Zero-based line number (may equal the line count)
+
+    Returns:
+        Byte offset of the line start, or len(data) past the last line
+    """
+    offset = 0
+    for _ in range(line):
+        newline = data.find(b"\n", offset)
+        if newline == -1:
+            return len(data)
+        offset = newline + 1
+    return offset
+
+
+def _replace_file(path: Path, mode: int, *chunks: bytes) -> None:
+    """Atomically replace a file with the concatenation of chunks.
+
+    Writes to a temporary file in the same directory and renames it over
+    the target, so readers never observe a partially written file.
+
+    Args:
+        path: File to replace
+        mode: Mode of the original file, applied to the replacement
+        *chunks: Byte strings to write in order
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+        try:
+            os.fchmod(tmp.fileno(), stat.S_IMODE(mode))
+            for chunk in chunks:
+                tmp.write(chunk)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    try:
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+@lru_cache(maxsize=256)
+def _validate(memory_dir_str: str, path: str) -> Path:
+    """Resolve a memory path against a memory directory.
+
+    Args:
+        memory_dir_str: Normalized memory directory ending with os.sep
+        path: Path to validate (should start with /memories)
+
+    Returns:
+        Absolute Path object
+
+    Raises:
+        ValueError: If path is outside memory directory
+    """
+    # Remove /memories prefix if present
+    rel_path = _MEMORIES_PREFIX_RE.sub("", path, count=1).lstrip("/")
+
+    # Construct full path (logical normalization, no filesystem access)
+    full_path = os.path.normpath(os.path.join(memory_dir_str, rel_path))
+
+    # Security check: ensure path is within memory directory
+    if not (full_path + os.sep).startswith(memory_dir_str):
+        logger.error("Path traversal attempt detected: %s", path)
+        raise ValueError(f"Path must be within memory directory: {path}")
+
+    return Path(full_path)
+
 
 class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
     """
@@ -46,12 +236,25 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
             memory_dir: Absolute path to the memory directory
         """
         super().__init__()
-        self.memory_dir = memory_dir.absolute()
-        logger.info(f"Initialized memory tool with directory: {self.memory_dir}")
+        # Resolved once, so a symlinked memory directory is trusted as the
+        # root and lstat/O_NOFOLLOW only ever apply to paths below it
+        self.memory_dir = Path(os.path.realpath(memory_dir))
+        # Directory string with trailing separator, used for containment
+        # checks without touching the filesystem
+        self._memory_dir_str = str(self.memory_dir) + os.sep
+        # Bumped before every mutating operation, so callers can tell whether
+        # memory may have changed since they last looked
+        self.generation = 0
+        logger.info("Initialized memory tool with directory: %s", self.memory_dir)
 
     def _validate_path(self, path: str) -> Path:
         """Validate that a path is within the memory directory.
 
+        The logical check is cached per (memory directory, path). The real
+        location of the parent directory is checked on every call, since
+        symlinks along the path can change between operations; the final
+        component is covered by O_NOFOLLOW and lstat-based handling.
+
         Args:
             path: Path to validate (should start with /memories)
 
@@ -61,23 +264,16 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
         Raises:
             ValueError: If path is outside memory directory
         """
-        # Remove /memories prefix if present
-        if path.startswith("/memories"):
-            path = path[len("/memories"):]
-        elif path.startswith("memories/"):
-            path = path[len("memories/"):]
-
-        # Construct full path
-        full_path = (self.memory_dir / path.lstrip("/")).resolve()
+        validated_path = _validate(self._memory_dir_str, path)
 
-        # Security check: ensure path is within memory directory
-        try:
-            full_path.relative_to(self.memory_dir)
-        except ValueError:
-            logger.error(f"Path traversal attempt detected: {path}")
-            raise ValueError(f"Path must be within memory directory: {path}")
+        path_str = str(validated_path)
+        if path_str + os.sep != self._memory_dir_str:
+            real_parent = os.path.realpath(os.path.dirname(path_str))
+            if not (real_parent + os.sep).startswith(self._memory_dir_str):
+                logger.error("Symlink escape attempt detected: %s", path)
+                raise ValueError(f"Path must be within memory directory: {path}")
 
-        return full_path
+        return validated_path
 
     def view(self, command) -> str:
         """View directory contents or file content.
@@ -91,36 +287,49 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
         try:
             path = command.path if hasattr(command, 'path') else command
             validated_path = self._validate_path(path)
-            logger.debug(f"View: {path} -> {validated_path}")
+            logger.debug("View: %s -> %s", path, validated_path)
 
-            if not validated_path.exists():
+            # One lstat answers both "exists?" and "directory?"
+            try:
+                st = os.lstat(validated_path)
+            except FileNotFoundError:
                 result = f"Path does not exist: {path}"
                 logger.debug(result)
                 return result
 
-            if validated_path.is_dir():
+            if stat.S_ISDIR(st.st_mode):
                 # List directory contents
-                contents = []
-                for item in sorted(validated_path.iterdir()):
-                    item_type = "DIR" if item.is_dir() else "FILE"
-                    rel_path = item.relative_to(self.memory_dir)
-                    contents.append(f"{item_type}: /memories/{rel_path}")
-
-                if not contents:
+                with os.scandir(validated_path) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+
+                # Entry types come from the directory read; relative paths are
+                # plain string slices against the normalized memory directory
+                prefix_len = len(self._memory_dir_str)
+                buf = io.StringIO()
+                for i, entry in enumerate(entries):
+                    if i:
+                        buf.write("\n")
+                    if entry.is_dir(follow_symlinks=False):
+                        buf.write("DIR: /memories/")
+                    else:
+                        buf.write("FILE: /memories/")
+                    buf.write(entry.path[prefix_len:])
+
+                if not entries:
                     result = f"Directory is empty: {path}"
                 else:
-                    result = "\n".join(contents)
+                    result = buf.getvalue()
 
-                logger.debug(f"Listed directory with {len(contents)} items")
+                logger.debug("Listed directory with %s items", len(entries))
                 return result
             else:
                 # Read file contents
-                content = validated_path.read_text(encoding="utf-8")
-                logger.debug(f"Read file: {len(content)} characters")
+                content = _read_file(validated_path).decode("utf-8")
+                logger.debug("Read file: %s characters", len(content))
                 return content
 
         except Exception as e:
-            logger.error(f"View failed: {e}", exc_info=True)
+            logger.error("View failed: %s", e, exc_info=True)
             return f"Error viewing {path}: {str(e)}"
 
     def create(self, command) -> str:
@@ -132,24 +341,26 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
         Returns:
             Success message
         """
+        self.generation += 1
+
         try:
             path = command.path
             content = command.file_text
             validated_path = self._validate_path(path)
-            logger.debug(f"Create: {path} -> {validated_path}")
+            logger.debug("Create: %s -> %s", path, validated_path)
 
             # Create parent directories if needed
             validated_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Write content
-            validated_path.write_text(content, encoding="utf-8")
+            # Write content (encoded once, written without text-layer buffering)
+            _write_file(validated_path, content.encode("utf-8"))
 
             result = f"Created file: {path}"
-            logger.info(f"Created file: {validated_path} ({len(content)} characters)")
+            logger.info("Created file: %s (%s characters)", validated_path, len(content))
             return result
 
         except Exception as e:
-            logger.error(f"Create failed: {e}", exc_info=True)
+            logger.error("Create failed: %s", e, exc_info=True)
             return f"Error creating {path}: {str(e)}"
 
     def str_replace(self, command) -> str:
@@ -161,82 +372,114 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
         Returns:
             Success message
         """
+        self.generation += 1
+
         try:
             path = command.path
             old_str = command.old_str
             new_str = command.new_str
             validated_path = self._validate_path(path)
-            logger.debug(f"StrReplace: {path} -> {validated_path}")
+            logger.debug("StrReplace: %s -> %s", path, validated_path)
 
             if not validated_path.exists():
                 result = f"File does not exist: {path}"
                 logger.error(result)
                 return result
 
-            # Read current content
-            content = validated_path.read_text(encoding="utf-8")
-
-            # Check if old string exists
-            if old_str not in content:
-                result = f"String not found in file: {old_str}"
-                logger.warning(result)
-                return result
-
-            # Replace string
-            new_content = content.replace(old_str, new_str, 1)
-
-            # Write back
-            validated_path.write_text(new_content, encoding="utf-8")
+            old_bytes = old_str.encode("utf-8")
+
+            with _map_file(validated_path) as (data, st):
+                # Locate the first occurrence without decoding the file
+                index = data.find(old_bytes)
+                if index == -1:
+                    result = f"String not found in file: {old_str}"
+                    logger.warning(result)
+                    return result
+
+                # Write back only the spliced byte ranges
+                _replace_file(
+                    validated_path,
+                    st.st_mode,
+                    data[:index],
+                    new_str.encode("utf-8"),
+                    data[index + len(old_bytes):],
+                )
 
             result = f"Replaced string in {path}"
-            logger.info(f"Replaced string in {validated_path}")
+            logger.info("Replaced string in %s", validated_path)
             return result
 
         except Exception as e:
-            logger.error(f"StrReplace failed: {e}", exc_info=True)
+            logger.error("StrReplace failed: %s", e, exc_info=True)
             return f"Error replacing string in {path}: {str(e)}"
 
     def insert(self, command) -> str:
         """Insert text at a specific line in a file.
 
+        Inserting after the last line (or with insert_line set to
+        APPEND_LINE) appends to the file instead of rewriting it.
+
         Args:
             command: Insert command with path, insert_line, new_str attributes
 
         Returns:
             Success message
         """
+        self.generation += 1
+
         try:
             path = command.path
             insert_line = command.insert_line
             new_str = command.new_str
             validated_path = self._validate_path(path)
-            logger.debug(f"Insert: {path} -> {validated_path} at line {insert_line}")
+            logger.debug("Insert: %s -> %s at line %s", path, validated_path, insert_line)
 
             if not validated_path.exists():
                 result = f"File does not exist: {path}"
                 logger.error(result)
                 return result
 
-            # Read current lines
-            lines = validated_path.read_text(encoding="utf-8").splitlines(keepends=True)
+            new_bytes = (new_str + "\n").encode("utf-8")
 
-            # Insert new content
-            if insert_line < 0 or insert_line > len(lines):
-                result = f"Invalid line number: {insert_line}"
-                logger.error(result)
+            if insert_line == APPEND_LINE:
+                # Append without reading the file
+                _write_file(validated_path, new_bytes, _APPEND_FLAGS)
+
+                result = f"Appended text to {path}"
+                logger.info("Appended text to %s", validated_path)
                 return result
 
-            lines.insert(insert_line, new_str + "\n")
+            with _map_file(validated_path) as (data, st):
+                line_count = _count_lines(data)
 
-            # Write back
-            validated_path.write_text("".join(lines), encoding="utf-8")
+                # Insert new content
+                if insert_line < 0 or insert_line > line_count:
+                    result = f"Invalid line number: {insert_line}"
+                    logger.error(result)
+                    return result
+
+                if insert_line < line_count:
+                    offset = _line_offset(data, insert_line)
+
+                    # Write back
+                    _replace_file(
+                        validated_path,
+                        st.st_mode,
+                        data[:offset],
+                        new_bytes,
+                        data[offset:],
+                    )
+
+            if insert_line == line_count:
+                # Inserting after the last line is a plain append
+                _write_file(validated_path, new_bytes, _APPEND_FLAGS)
 
             result = f"Inserted text at line {insert_line} in {path}"
-            logger.info(f"Inserted text at line {insert_line} in {validated_path}")
+            logger.info("Inserted text at line %s in %s", insert_line, validated_path)
             return result
 
         except Exception as e:
-            logger.error(f"Insert failed: {e}", exc_info=True)
+            logger.error("Insert failed: %s", e, exc_info=True)
             return f"Error inserting text in {path}: {str(e)}"
 
     def delete(self, command) -> str:
@@ -248,32 +491,36 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
         Returns:
             Success message
         """
+        self.generation += 1
+
         try:
             path = command.path
             validated_path = self._validate_path(path)
-            logger.debug(f"Delete: {path} -> {validated_path}")
+            logger.debug("Delete: %s -> %s", path, validated_path)
 
-            if not validated_path.exists():
+            # One lstat answers both "exists?" and "directory?"
+            try:
+                st = os.lstat(validated_path)
+            except FileNotFoundError:
                 result = f"Path does not exist: {path}"
                 logger.warning(result)
                 return result
 
-            if validated_path.is_dir():
+            if stat.S_ISDIR(st.st_mode):
                 # Delete directory and contents
-                import shutil
                 shutil.rmtree(validated_path)
                 result = f"Deleted directory: {path}"
-                logger.info(f"Deleted directory: {validated_path}")
+                logger.info("Deleted directory: %s", validated_path)
             else:
-                # Delete file
+                # Delete file (or symlink itself, never its target)
                 validated_path.unlink()
                 result = f"Deleted file: {path}"
-                logger.info(f"Deleted file: {validated_path}")
+                logger.info("Deleted file: %s", validated_path)
 
             return result
 
         except Exception as e:
-            logger.error(f"Delete failed: {e}", exc_info=True)
+            logger.error("Delete failed: %s", e, exc_info=True)
             return f"Error deleting {path}: {str(e)}"
 
     def rename(self, command) -> str:
@@ -285,14 +532,18 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
         Returns:
             Success message
         """
+        self.generation += 1
+
         try:
             old_path = command.old_path
             new_path = command.new_path
             validated_old_path = self._validate_path(old_path)
             validated_new_path = self._validate_path(new_path)
-            logger.debug(f"Rename: {old_path} -> {new_path}")
+            logger.debug("Rename: %s -> %s", old_path, new_path)
 
-            if not validated_old_path.exists():
+            try:
+                os.lstat(validated_old_path)
+            except FileNotFoundError:
                 result = f"Source path does not exist: {old_path}"
                 logger.error(result)
                 return result
@@ -304,9 +555,62 @@ class LocalFilesystemMemoryTool(BetaAbstractMemoryTool):
             validated_old_path.rename(validated_new_path)
 
             result = f"Renamed {old_path} to {new_path}"
-            logger.info(f"Renamed {validated_old_path} to {validated_new_path}")
+            logger.info("Renamed %s to %s", validated_old_path, validated_new_path)
             return result
 
         except Exception as e:
-            logger.error(f"Rename failed: {e}", exc_info=True)
+            logger.error("Rename failed: %s", e, exc_info=True)
             return f"Error renaming {old_path}: {str(e)}"
+
+
+class AsyncLocalFilesystemMemoryTool(BetaAsyncAbstractMemoryTool):
+    """
+    Async adapter around LocalFilesystemMemoryTool.
+
+    Lets the same filesystem backend be used with AsyncAnthropic tool
+    runners, which require tools with coroutine handlers. Each operation
+    runs in a worker thread so disk I/O does not block the event loop.
+    """
+
+    def __init__(self, memory_dir: Path):
+        """Initialize the async memory tool with a specific directory.
+
+        Args:
+            memory_dir: Absolute path to the memory directory
+        """
+        super().__init__()
+        self._tool = LocalFilesystemMemoryTool(memory_dir)
+
+    @property
+    def memory_dir(self) -> Path:
+        """Absolute path to the memory directory."""
+        return self._tool.memory_dir
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped before every mutating operation."""
+        return self._tool.generation
+
+    async def view(self, command) -> str:
+        """View directory contents or file content."""
+        return await asyncio.to_thread(self._tool.view, command)
+
+    async def create(self, command) -> str:
+        """Create or overwrite a file."""
+        return await asyncio.to_thread(self._tool.create, command)
+
+    async def str_replace(self, command) -> str:
+        """Replace a string in a file."""
+        return await asyncio.to_thread(self._tool.str_replace, command)
+
+    async def insert(self, command) -> str:
+        """Insert text at a specific line in a file."""
+        return await asyncio.to_thread(self._tool.insert, command)
+
+    async def delete(self, command) -> str:
+        """Delete a file or directory."""
+        return await asyncio.to_thread(self._tool.delete, command)
+
+    async def rename(self, command) -> str:
+        """Rename or move a file/directory."""
+        return await asyncio.to_thread(self._tool.rename, command)
@@ -6,7 +6,8 @@ tool to persist todo data across sessions.
 
 Architecture:
 - TodoAgent class manages the conversation loop and API interactions
-- Uses Anthropic's beta tool_runner for automatic tool execution
+- Uses Anthropic's beta tool_runner (AsyncAnthropic) for automatic tool execution
+- Runs on a single asyncio event loop; stdin is read off-loop
 - Maintains conversation history for context
 - Processes user input as natural language (no rigid commands)
 
@@ -19,7 +20,7 @@ The application demonstrates an experimental approach to data persistence where:
 Key Features:
 - Pure natural language interface (no commands except /quit)
 - Autonomous data organization by Claude
-- Real-time conversation with tool use
+- Real-time conversation with tool use, with responses streamed as generated
 - Comprehensive DEBUG logging for observability
 - Graceful error handling and user feedback
 
@@ -34,18 +35,159 @@ Usage:
     You: /quit
 """
 
+import asyncio
+import io
 import logging
+import re
 import sys
-from typing import List
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
 
-from anthropic import Anthropic
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from anthropic.types import MessageParam
 
 import config
-from memory_tool import LocalFilesystemMemoryTool
+from memory_tool import AsyncLocalFilesystemMemoryTool
+
+__all__ = ["TodoAgent", "main"]
 
 logger = logging.getLogger(__name__)
 
+# Runs of anything but word characters, collapsed when normalizing queries
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+class CachedResponse(NamedTuple):
+    """A response to a read-only turn, reusable while memory is unchanged."""
+
+    generation: int
+    content: Any
+    text: str
+
+
+def _normalize_query(text: str) -> str:
+    """Normalize user input for response cache keys.
+
+    Case, punctuation and spacing are ignored, so "What are my tasks?" and
+    "what are my tasks" share an entry.
+
+    Args:
+        text: Raw user input
+
+    Returns:
+        Normalized query text
+    """
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+# Instruction used when folding older turns into a summary
+HISTORY_SUMMARY_PROMPT = (
+    "Summarize the following conversation between a user and a todo "
+    "assistant in a few sentences. Keep any tasks, their status, and user "
+    "preferences that later turns may rely on."
+)
+
+
+async def _read_input(prompt: str) -> str:
+    """Read a line from stdin without blocking the event loop.
+
+    input() runs on a daemon thread rather than the default executor, so a
+    Ctrl+C at the prompt can end the program without waiting on the
+    blocked read.
+
+    Args:
+        prompt: Prompt to display
+
+    Returns:
+        The line read (EOFError propagates on Ctrl+D)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(method, value):
+        if not future.done():
+            method(value)
+
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, line)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+def _message_text(message: MessageParam) -> str:
+    """Extract the plain text of a history message.
+
+    Args:
+        message: User or assistant message (string or block content)
+
+    Returns:
+        Concatenated text blocks; non-text blocks are skipped
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+
+    parts = []
+    for block in content:
+        if isinstance(block, dict):
+            if block.get("type") == "text":
+                parts.append(block["text"])
+        elif block.type == "text":
+            parts.append(block.text)
+    return "\n".join(parts)
+
+
+def _content_params(content: List[Any]) -> List[Dict[str, Any]]:
+    """Convert SDK response blocks to plain request params, once.
+
+    Stored this way, history is not re-dumped from pydantic models on
+    every later request.
+
+    Args:
+        content: Content blocks of an API response
+
+    Returns:
+        Equivalent list of JSON-ready dicts
+    """
+    return [block.model_dump(mode="json", exclude_none=True) for block in content]
+
+
+def _with_cache_breakpoints(messages: List[MessageParam]) -> List[MessageParam]:
+    """Build the request copy of the history with prompt cache breakpoints.
+
+    User text is always sent as text blocks so earlier turns serialize the
+    same way every time, and the last two user turns carry cache_control:
+    the newest extends the cached prefix, the previous one matches what was
+    cached on the last turn. The stored history is never modified.
+
+    Args:
+        messages: Conversation history
+
+    Returns:
+        New message list suitable for the API request
+    """
+    user_indexes = [i for i, message in enumerate(messages) if message["role"] == "user"]
+    breakpoints = set(user_indexes[-config.CACHE_BREAKPOINT_TURNS:])
+
+    request_messages = []
+    for i, message in enumerate(messages):
+        content = message["content"]
+        if message["role"] == "user" and isinstance(content, str):
+            block = {"type": "text", "text": content}
+            if i in breakpoints:
+                block["cache_control"] = config.CACHE_CONTROL
+            message = {"role": "user", "content": [block]}
+        request_messages.append(message)
+
+    return request_messages
+
 
 class TodoAgent:
     """CLI chat interface for the todo agent."""
@@ -58,19 +200,64 @@ class TodoAgent:
         # Validate configuration
         config.validate_config()
 
+        # Long-lived HTTP connection pool so follow-up turns and tool-use
+        # round trips reuse warm TCP/TLS connections
+        self._http = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+        )
+
         # Initialize Anthropic client
-        self.client = Anthropic(api_key=config.ANTHROPIC_API_KEY)
+        self.client = AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY, http_client=self._http)
         logger.info("Initialized Anthropic client")
 
         # Initialize memory tool
-        self.memory_tool = LocalFilesystemMemoryTool(config.get_memory_path())
+        self.memory_tool = AsyncLocalFilesystemMemoryTool(config.get_memory_path())
+
+        # System prompt blocks, built once so every request in the session
+        # sends a byte-identical cached prefix
+        self._system_prompt = [{
+            "type": "text",
+            "text": config.get_system_prompt(),
+            "cache_control": config.CACHE_CONTROL,
+        }]
 
         # Conversation history
         self.messages: List[MessageParam] = []
 
+        # Responses to read-only turns, keyed by normalized query
+        self._response_cache: Dict[str, CachedResponse] = {}
+        self._response_cache_hits = 0
+
+        # Number of memory tool calls made during the last processed turn
+        self._last_turn_tool_uses = 0
+
         logger.info("Todo agent initialized successfully")
 
+    async def close(self):
+        """Close the HTTP connection pool."""
+        await self._http.aclose()
+        logger.debug("Closed HTTP connection pool")
+
     def run(self):
+        """Run the main chat loop on an asyncio event loop."""
+        # With BATCH_MODE set, piped input is answered as independent
+        # queries through the Message Batches API
+        if config.BATCH_MODE and not sys.stdin.isatty():
+            session = self._arun_batch()
+        else:
+            session = self._arun()
+        try:
+            asyncio.run(session)
+        except KeyboardInterrupt:
+            logger.info("Interrupted by user (Ctrl+C)")
+            print("\n\nGoodbye!")
+
+    async def _arun(self):
         """Run the main chat loop."""
         logger.info("Starting todo agent CLI")
         print("=== Agent Memory Todo App ===")
@@ -81,7 +268,7 @@ class TodoAgent:
             while True:
                 # Get user input
                 try:
-                    user_input = input("You: ").strip()
+                    user_input = (await _read_input("You: ")).strip()
                 except EOFError:
                     # Handle Ctrl+D
                     print("\nGoodbye!")
@@ -97,7 +284,7 @@ class TodoAgent:
                     break
 
                 # Log user message
-                logger.info(f"User: {user_input}")
+                logger.info("User: %s", user_input)
 
                 # Add user message to conversation
                 self.messages.append({
@@ -107,80 +294,396 @@ class TodoAgent:
 
                 # Process with Claude
                 try:
-                    response_text = self._process_message()
-                    print(f"\nAgent: {response_text}\n")
-                    logger.info(f"Agent: {response_text}")
+                    cache_key = self._cache_key(user_input)
+                    response_text = self._respond_from_cache(cache_key)
+                    if response_text is not None:
+                        sys.stdout.write(f"\nAgent: {response_text}\n\n")
+                    else:
+                        # Flush the prefix before the response streams in
+                        sys.stdout.write("\nAgent: ")
+                        sys.stdout.flush()
+                        generation = self.memory_tool.generation
+                        response_text = await self._process_message()
+                        self._cache_response(cache_key, generation)
+                        sys.stdout.write("\n\n")
+                    sys.stdout.flush()
+                    logger.info("Agent: %s", response_text)
 
                 except Exception as e:
-                    logger.error(f"Error processing message: {e}", exc_info=True)
-                    print(f"\nError: {e}\n")
+                    logger.error("Error processing message: %s", e, exc_info=True)
+                    sys.stdout.write(f"\nError: {e}\n\n")
+                    sys.stdout.flush()
                     # Remove the failed message from history
                     self.messages.pop()
 
-        except KeyboardInterrupt:
-            logger.info("Interrupted by user (Ctrl+C)")
-            print("\n\nGoodbye!")
+                else:
+                    # Keep the resent history bounded
+                    await self._compact_history()
+
+        except Exception as e:
+            logger.error("Unexpected error in main loop: %s", e, exc_info=True)
+            print(f"\nUnexpected error: {e}")
+            sys.exit(1)
+        finally:
+            await self.close()
+            logger.info("Response cache hits this session: %s", self._response_cache_hits)
+            logger.info("Todo agent session ended")
+
+    async def _arun_batch(self):
+        """Answer queries piped on stdin using the Message Batches API.
+
+        Each non-empty line up to /quit is treated as an independent query
+        (no shared conversation history, and queries in the same batch see
+        the same memory state). Every BATCH_MAX_REQUESTS lines are submitted
+        as soon as they are read, plus any remainder at end of input, and
+        answered in input order.
+        """
+        logger.info("Starting todo agent in batch mode")
+
+        try:
+            chunk = []
+            while True:
+                try:
+                    query = (await _read_input("")).strip()
+                except EOFError:
+                    break
+
+                if not query:
+                    continue
+                if query == "/quit":
+                    break
+
+                chunk.append(query)
+                if len(chunk) == config.BATCH_MAX_REQUESTS:
+                    await self._answer_batch(chunk)
+                    chunk = []
+
+            if chunk:
+                await self._answer_batch(chunk)
+
         except Exception as e:
-            logger.error(f"Unexpected error in main loop: {e}", exc_info=True)
+            logger.error("Unexpected error in batch mode: %s", e, exc_info=True)
             print(f"\nUnexpected error: {e}")
             sys.exit(1)
         finally:
+            await self.close()
             logger.info("Todo agent session ended")
 
-    def _process_message(self) -> str:
+    async def _answer_batch(self, queries: List[str]):
+        """Answer one batch of queries and write the transcript.
+
+        Args:
+            queries: User queries, at most BATCH_MAX_REQUESTS
+        """
+        responses = await self._process_batch(queries)
+
+        # Write the whole batch's transcript at once
+        output = io.StringIO()
+        for query, response_text in zip(queries, responses):
+            logger.info("User: %s", query)
+            logger.info("Agent: %s", response_text)
+            output.write(f"You: {query}\nAgent: {response_text}\n\n")
+        sys.stdout.write(output.getvalue())
+        sys.stdout.flush()
+
+    async def _process_batch(self, queries: List[str]) -> List[str]:
+        """Answer independent queries with one Message Batch per round.
+
+        Memory tool calls requested by the batch results are executed
+        locally, in query order, and the affected conversations are
+        resubmitted together as the next batch until every query has a
+        final answer.
+
+        Args:
+            queries: User queries, one request each
+
+        Returns:
+            Response texts in the same order as queries
+        """
+        conversations: Dict[str, List[Any]] = {
+            f"query-{i}": [{"role": "user", "content": query}]
+            for i, query in enumerate(queries)
+        }
+        responses: Dict[str, str] = {}
+        tools = [self.memory_tool.to_dict()]
+
+        for _ in range(config.BATCH_MAX_TOOL_ROUNDS):
+            if not conversations:
+                break
+
+            batch = await self.client.beta.messages.batches.create(
+                requests=[
+                    {
+                        "custom_id": custom_id,
+                        "params": {
+                            "model": config.MODEL,
+                            "system": self._system_prompt,
+                            "messages": messages,
+                            "tools": tools,
+                            "context_management": config.CONTEXT_MANAGEMENT,
+                            "max_tokens": 4096,
+                        },
+                    }
+                    for custom_id, messages in conversations.items()
+                ],
+                betas=[config.BETA_HEADER],
+            )
+            logger.debug("Submitted batch %s with %s requests", batch.id, len(conversations))
+            await self._wait_for_batch(batch.id)
+
+            results = {}
+            async for entry in await self.client.beta.messages.batches.results(
+                batch.id, betas=[config.BETA_HEADER]
+            ):
+                results[entry.custom_id] = entry.result
+
+            # Run tool calls in query order so memory changes are deterministic
+            next_conversations = {}
+            for custom_id, messages in conversations.items():
+                result = results.get(custom_id)
+                if result is None or result.type != "succeeded":
+                    status = result.type if result is not None else "missing"
+                    responses[custom_id] = f"(Batch request {status})"
+                    continue
+
+                message = result.message
+                tool_uses = [block for block in message.content if block.type == "tool_use"]
+                if not tool_uses:
+                    responses[custom_id] = _message_text({"content": message.content})
+                    continue
+
+                tool_results = []
+                for block in tool_uses:
+                    logger.debug("Tool use: %s with input: %s", block.name, block.input)
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": await self.memory_tool.call(block.input),
+                    })
+                next_conversations[custom_id] = [
+                    *messages,
+                    {"role": "assistant", "content": _content_params(message.content)},
+                    {"role": "user", "content": tool_results},
+                ]
+            conversations = next_conversations
+
+        for custom_id in conversations:
+            responses[custom_id] = "(Stopped after too many tool use rounds)"
+
+        return [
+            responses[f"query-{i}"] or "(Agent performed actions without a text response)"
+            for i in range(len(queries))
+        ]
+
+    async def _wait_for_batch(self, batch_id: str):
+        """Poll a Message Batch until it has finished processing.
+
+        Args:
+            batch_id: ID of the submitted batch
+        """
+        while True:
+            batch = await self.client.beta.messages.batches.retrieve(
+                batch_id, betas=[config.BETA_HEADER]
+            )
+            if batch.processing_status == "ended":
+                logger.debug("Batch %s ended: %s", batch_id, batch.request_counts)
+                return
+            await asyncio.sleep(config.BATCH_POLL_INTERVAL)
+
+    def _cache_key(self, user_input: str) -> Optional[str]:
+        """Build the response cache key for the current turn.
+
+        Turns that likely depend on the conversation bypass the cache:
+        short replies such as "yes" or "the first one", and any reply to
+        an agent turn that ended with a question.
+
+        Args:
+            user_input: The user's message, already appended to history
+
+        Returns:
+            Normalized query, or None if the turn must not use the cache
+        """
+        query = _normalize_query(user_input)
+        if len(query.split()) < config.RESPONSE_CACHE_MIN_WORDS:
+            return None
+
+        if len(self.messages) > 1 and self.messages[-2]["role"] == "assistant":
+            if _message_text(self.messages[-2]).rstrip().endswith("?"):
+                return None
+
+        return query
+
+    def _respond_from_cache(self, cache_key: Optional[str]) -> Optional[str]:
+        """Answer a repeated read-only query without calling the API.
+
+        A cached response is only used if no mutating memory operation has
+        run since it was produced. On a hit the response is added to the
+        conversation history like a normal turn.
+
+        Args:
+            cache_key: Key from _cache_key for the current turn
+
+        Returns:
+            The cached response text, or None on a miss
+        """
+        if cache_key is None:
+            return None
+
+        entry = self._response_cache.get(cache_key)
+        if entry is None or entry.generation != self.memory_tool.generation:
+            return None
+
+        self._response_cache_hits += 1
+        logger.debug("Response cache hit")
+        self.messages.append({"role": "assistant", "content": entry.content})
+        return entry.text
+
+    def _cache_response(self, cache_key: Optional[str], generation: int):
+        """Remember the last turn's response if it only read memory.
+
+        Turns that did not consult memory are answered from the
+        conversation alone, and turns that modified memory are not
+        repeatable, so neither is cached. Only the final message is kept:
+        narration from earlier tool-use rounds ("Let me check...") would
+        be misleading when replayed without the tool call.
+
+        Args:
+            cache_key: Key from _cache_key for the turn
+            generation: Memory tool generation before the turn
+        """
+        if cache_key is None:
+            return
+        if not self._last_turn_tool_uses or self.memory_tool.generation != generation:
+            return
+
+        content = self.messages[-1]["content"]
+        text = _message_text(self.messages[-1])
+        if not text:
+            return
+
+        # Entries from before the latest write can never hit again
+        self._response_cache = {
+            key: entry for key, entry in self._response_cache.items()
+            if entry.generation == generation
+        }
+        self._response_cache[cache_key] = CachedResponse(
+            generation=generation,
+            content=content,
+            text=text,
+        )
+
+    async def _compact_history(self):
+        """Replace older turns with a summary once history grows too long.
+
+        Keeps the most recent turns verbatim and folds everything before
+        them into a single user message holding a short summary, so the
+        input sent on each turn stays bounded regardless of session length.
+        Failures are logged and leave the history untouched.
+        """
+        if len(self.messages) <= config.HISTORY_MAX_MESSAGES:
+            return
+
+        # The kept tail must start with an assistant turn so roles still
+        # alternate after the summary message
+        split = len(self.messages) - config.HISTORY_KEEP_MESSAGES
+        if self.messages[split]["role"] == "user":
+            split += 1
+
+        older = self.messages[:split]
+        transcript = "\n\n".join(
+            f"{message['role']}: {_message_text(message)}" for message in older
+        )
+
+        try:
+            result = await self.client.messages.create(
+                model=config.MODEL,
+                max_tokens=config.HISTORY_SUMMARY_MAX_TOKENS,
+                messages=[{
+                    "role": "user",
+                    "content": f"{HISTORY_SUMMARY_PROMPT}\n\n{transcript}"
+                }],
+            )
+        except Exception as e:
+            logger.warning("History summarization failed, keeping full history: %s", e)
+            return
+
+        summary = "".join(block.text for block in result.content if block.type == "text")
+        self.messages = [
+            {"role": "user", "content": f"Summary of the earlier conversation:\n{summary}"},
+            *self.messages[split:],
+        ]
+        logger.debug("Summarized %s messages; %s remain in history", len(older), len(self.messages))
+
+    async def _process_message(self) -> str:
         """Process the current message with Claude.
 
+        Response text is streamed to stdout as it is generated.
+
         Returns:
             The agent's response text
         """
-        logger.debug(f"Processing message with {len(self.messages)} messages in history")
+        logger.debug("Processing message with %s messages in history", len(self.messages))
 
         # Create tool runner for streaming response with tool use
         runner = self.client.beta.messages.tool_runner(
             model=config.MODEL,
-            system=config.get_system_prompt(),
-            messages=self.messages,
+            system=self._system_prompt,
+            messages=_with_cache_breakpoints(self.messages),
             tools=[self.memory_tool],
             context_management=config.CONTEXT_MANAGEMENT,
             max_tokens=4096,
             betas=[config.BETA_HEADER],
+            stream=True,
         )
 
-        # Collect response
+        # Collect response (text deltas, as printed)
         response_text_parts = []
 
         logger.debug("Starting message processing")
 
         # Process the message - the runner handles tool execution automatically
+        # and yields one stream per API round trip
         final_message = None
-        for message in runner:
-            final_message = message
-
-            # Log tool uses
-            for block in message.content:
-                if block.type == "tool_use":
-                    logger.debug(
-                        f"Tool use: {block.name} with input: {block.input}"
-                    )
+        tool_uses = 0
+        log_tool_uses = logger.isEnabledFor(logging.DEBUG)
+        async for stream in runner:
+            async for event in stream:
+                if event.type == "content_block_start" and event.content_block.type == "text":
+                    # Separate consecutive text blocks
+                    if response_text_parts:
+                        sys.stdout.write("\n")
+                        response_text_parts.append("\n")
+                elif event.type == "text":
+                    # Print text as it arrives
+                    sys.stdout.write(event.text)
+                    sys.stdout.flush()
+                    response_text_parts.append(event.text)
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    # Count tool uses as their blocks complete, logging them
+                    # only when DEBUG is enabled
+                    tool_uses += 1
+                    if log_tool_uses:
+                        block = event.content_block
+                        logger.debug("Tool use: %s with input: %s", block.name, block.input)
+
+            final_message = await stream.get_final_message()
+
+        self._last_turn_tool_uses = tool_uses
 
-        # Extract text content from final message
         if final_message:
-            for block in final_message.content:
-                if block.type == "text":
-                    response_text_parts.append(block.text)
-
             # Add the final assistant message to conversation history
             self.messages.append({
                 "role": "assistant",
-                "content": final_message.content
+                "content": _content_params(final_message.content)
             })
 
-        response_text = "\n".join(response_text_parts)
+        response_text = "".join(response_text_parts)
 
         if not response_text:
             response_text = "(Agent performed actions without a text response)"
+            sys.stdout.write(response_text)
 
-        logger.debug(f"Response collected: {len(response_text)} characters")
+        logger.debug("Response collected: %s characters", len(response_text))
 
         return response_text
 